@@ -1,29 +1,32 @@
+import io
 import logging
 import os
 import sys
 import asyncio
 sys.path.append(os.getcwd())
-from src.core.config import settings
-from src.providers.news_client import NewsAPIClient, CachedNewsProvider, AutoRetryProvider
-from src.providers.analysis_client import GeminiAnalyzer
-from src.core.pipeline import StockAnalysisPipeline
 from src.core.logger import setup_logging
-from src.utils.stats_collector import StatsCollector
 from typing import Dict, Any
 
 logger = logging.getLogger("MAIN")
 
+REPORT_HEADER = "\n" + "💰" * 15 + " FINAL INVESTMENT REPORT " + "💰" * 15 + "\n"
+REPORT_RULE = "-" * 65 + "\n"
+REPORT_FOOTER = "\n" + "💰" * 53 + "\n\n"
+
+
 def print_final_recommendation(recommendation_data: Dict[str, Any], ticker: str):
-    print("\n" + "💰" * 15 + " FINAL INVESTMENT REPORT " + "💰" * 15)
-    print(f"📈 Ticker: {ticker}")
-    print(f"🎯 Sentiment: {recommendation_data.get('final_sentiment', 'N/A')}")
-    print(f"⭐ Recommendation: {recommendation_data.get('recommendation', 'N/A')}")
-    print("-" * 65)
-    print(f"📝 Summary: {recommendation_data.get('overall_summary', 'N/A')}")
-    print("\n⚠️ Risks:")
+    buf = io.StringIO()
+    buf.write(REPORT_HEADER)
+    buf.write(f"📈 Ticker: {ticker}\n")
+    buf.write(f"🎯 Sentiment: {recommendation_data.get('final_sentiment', 'N/A')}\n")
+    buf.write(f"⭐ Recommendation: {recommendation_data.get('recommendation', 'N/A')}\n")
+    buf.write(REPORT_RULE)
+    buf.write(f"📝 Summary: {recommendation_data.get('overall_summary', 'N/A')}\n")
+    buf.write("\n⚠️ Risks:\n")
     for risk in recommendation_data.get('major_risks', []):
-        print(f"  - {risk}")
-    print("\n" + "💰" * 53 + "\n")
+        buf.write(f"  - {risk}\n")
+    buf.write(REPORT_FOOTER)
+    sys.stdout.write(buf.getvalue())
 
 
 async def main():
@@ -35,6 +38,13 @@ async def main():
 
     ticker = sys.argv[1].upper()
 
+    # Deferred past argument validation: the Gemini SDK takes most of a second to import
+    from src.core.config import settings
+    from src.core.pipeline import StockAnalysisPipeline
+    from src.providers.analysis_client import GeminiAnalyzer
+    from src.providers.news_client import NewsAPIClient, CachedNewsProvider, AutoRetryProvider
+    from src.utils.stats_collector import StatsCollector
+
     logger.info(f"🚀 Starting analysis for ticker: {ticker}")
 
     news_key = settings.NEWS_API_KEY.get_secret_value()
@@ -53,9 +63,11 @@ async def main():
 
     base_provider = NewsAPIClient(api_key=news_key)
     retry_provider = AutoRetryProvider(inner_provider=base_provider, stats=stats_collector, max_retries=3)
-    final_news_provider = CachedNewsProvider(retry_provider, cache_dir="data/cache", ttl_seconds=ttl_seconds)
+    final_news_provider = CachedNewsProvider(retry_provider, cache_dir=settings.CACHE_DIR, ttl_seconds=ttl_seconds)
     my_gemini_client = GeminiAnalyzer(api_key=gemini_key)
 
+    # One run per process, so the pipeline's in-memory report cache never hits here;
+    # it pays off in the API server, which keeps one pipeline alive
     pipeline = StockAnalysisPipeline(
         news_provider=final_news_provider,
         analyzer=my_gemini_client,
@@ -72,6 +84,8 @@ async def main():
         logger.critical(f"🛑 Critical failure: {e}", exc_info=True)
         stats_collector.update_error(stage="PIPELINE_ERROR", message=str(e))
         sys.exit(1)
+    finally:
+        await base_provider.aclose()
 
 
 if __name__ == "__main__":
@@ -26,15 +26,16 @@ async def lifespan(app_: FastAPI):
 
     base_provider = NewsAPIClient(api_key=news_key)
     retry_provider = AutoRetryProvider(base_provider, stats=stats)
-    cached_provider = CachedNewsProvider(retry_provider, ttl_seconds=settings.CACHE_TTL_SECONDS)
+    cached_provider = CachedNewsProvider(retry_provider, cache_dir=settings.CACHE_DIR, ttl_seconds=settings.CACHE_TTL_SECONDS)
     analyzer = GeminiAnalyzer(api_key=gemini_key)
 
-    pipeline = StockAnalysisPipeline(cached_provider, analyzer, stats)
+    pipeline = StockAnalysisPipeline(cached_provider, analyzer, stats, report_ttl_seconds=settings.CACHE_TTL_SECONDS)
     app_.state.pipeline = pipeline
 
     yield
 
     logger.info("🛑 Server shutting down...")
+    await base_provider.aclose()
 
 
 app = FastAPI(title="Stock AI Analyst", lifespan=lifespan)
@@ -10,6 +10,7 @@ class Settings(BaseSettings):
     Application configuration using Pydantic.
     This class automatically loads environment variables from the .env file,
     validates their types, and ensures required keys are present.
+    The loaded settings are frozen; values cannot be reassigned at runtime.
     """
 
     # --- REQUIRED FIELDS ---
@@ -20,12 +21,15 @@ class Settings(BaseSettings):
     ARTICLES_TO_FETCH: int = Field(default=50, gt=0, description="Number of articles to fetch from NewsAPI")
     ARTICLES_TO_INFERENCE: int = Field(default=5, gt=0, description="Number of articles to pass to the LLM")
     CACHE_TTL_SECONDS: int = Field(default=3600, gt=0, description="Time-to-live for cache in seconds")
+    CACHE_DIR: str = Field(default="data/cache", description="Directory for on-disk caches (news, embeddings, LLM responses)")
+    MAX_CONCURRENT_LLM_CALLS: int = Field(default=8, gt=0, description="Upper bound on in-flight Gemini requests")
 
     # --- CONFIGURATION ---
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
-        extra="ignore"
+        extra="ignore",
+        frozen=True
     )
 
 try:
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any
 
@@ -7,6 +8,18 @@ class INewsProvider(ABC):
     async def fetch_articles(self, ticker: str, count: int) -> List[Dict[str, str]]:
         pass
 
+    async def fetch_many(self, tickers: List[str], count: int,
+                         max_concurrency: int = 8) -> Dict[str, List[Dict[str, str]]]:
+        """Fetches several tickers concurrently, at most max_concurrency requests in flight."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _fetch(ticker: str) -> List[Dict[str, str]]:
+            async with semaphore:
+                return await self.fetch_articles(ticker, count)
+
+        results = await asyncio.gather(*(_fetch(ticker) for ticker in tickers))
+        return dict(zip(tickers, results))
+
 
 class IStockAnalyzer(ABC):
     @abstractmethod
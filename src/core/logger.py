@@ -1,7 +1,10 @@
+import atexit
 import logging
 import os
+import queue
 import sys
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
 _initialized = False
 
@@ -9,6 +12,8 @@ _initialized = False
 def setup_logging(log_dir: str = "data/logs", console_level=logging.INFO, file_level=logging.DEBUG):
     """
     Saves logs to .data/logs
+    Records are only enqueued on the calling thread; a QueueListener thread does the
+    file and console writes, so logging never blocks the event loop on I/O.
     """
     global _initialized
     if _initialized:
@@ -32,10 +37,15 @@ def setup_logging(log_dir: str = "data/logs", console_level=logging.INFO, file_l
     console_handler.setLevel(console_level)
     console_handler.setFormatter(log_format)
 
+    log_queue: queue.Queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    # Drains the queue so the last records reach the file before the process exits
+    atexit.register(listener.stop)
+
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    root_logger.addHandler(QueueHandler(log_queue))
 
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("google").setLevel(logging.WARNING)
@@ -1,34 +1,59 @@
 #!/usr/bin/env python3
 
 import asyncio
-import json
-import sys
-import time
-from typing import List, Dict, Any
-import faiss
+import logging
+import os
+import weakref
+from datetime import date
+from typing import List, Dict, Any, Optional, Tuple
+from google.api_core.exceptions import DeadlineExceeded, InternalServerError, ResourceExhausted, ServiceUnavailable
 import google.generativeai as genai
+from google.generativeai.client import get_default_generative_async_client
 import numpy as np
+import orjson
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from src.core.config import settings
 from src.core.interfaces import IStockAnalyzer
+from src.providers.gemini_client import EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, FLASH_MODEL, configure_gemini, get_model
+from src.utils.embedding_cache import EmbeddingCache
+from src.utils.llm_cache import LLMResponseCache
 
+logger = logging.getLogger(__name__)
 
 class GeminiAnalyzer(IStockAnalyzer):
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_dir: str = settings.CACHE_DIR):
         self.api_key = api_key
+        self.cache_dir = cache_dir
+        configure_gemini(api_key)
+        self.embedding_cache = EmbeddingCache(
+            EMBEDDING_MODEL, EMBEDDING_DIMENSIONS, db_path=os.path.join(cache_dir, "embeddings.db")
+        )
+        self.llm_cache = LLMResponseCache(
+            FLASH_MODEL, os.path.join(cache_dir, "llm"), ttl_seconds=settings.CACHE_TTL_SECONDS
+        )
 
     async def filter_relevant(self, ticker: str, articles: List[Dict], count: int) -> List[str]:
-        article_texts, index = embed_articles(articles)
-        relevant_texts = search_relevant_articles(ticker, article_texts, index, count)
-        return relevant_texts
+        search_query = SEARCH_QUERY_TEMPLATE.format(ticker=ticker)
+        article_texts, article_embeddings, query_embedding = await embed_articles(
+            articles, search_query, cache=self.embedding_cache
+        )
+        return search_relevant_articles(article_texts, article_embeddings, query_embedding, count)
 
     async def analyze(self, ticker: str, articles: List[str]) -> Dict[str, Any]:
-        return await analyze_articles_concurrently(ticker, articles, self.api_key)
+        analysis = await analyze_articles_concurrently(ticker, articles, llm_cache=self.llm_cache)
+        await self.llm_cache.save()
+        return analysis
 
     async def synthesize(self, ticker: str, analysis_results: List[Dict]) -> Dict[str, Any]:
-        return await synthesize_report(ticker, analysis_results, self.api_key)
+        return await synthesize_report(ticker, analysis_results)
 
 
+# BatchEmbedContents accepts at most this many requests per call
+EMBEDDING_BATCH_SIZE = 100
+
+SEARCH_QUERY_TEMPLATE = "Significant positive or negative news impacting {ticker} stock price and sentiment."
+
 # For articles summaries
 ANALYSIS_SCHEMA = {
     "type": "object",
@@ -43,6 +68,28 @@ ANALYSIS_SCHEMA = {
     "required": ["headline", "sentiment_score", "sentiment_category", "impact_reason"]
 }
 
+# Several articles per request; each answer echoes the number of the snippet it analyzes
+ANALYSIS_BATCH_ITEM_SCHEMA = {
+    **ANALYSIS_SCHEMA,
+    "properties": {
+        "index": {"type": "integer", "description": "The number of the snippet this analysis is for."},
+        **ANALYSIS_SCHEMA["properties"],
+    },
+    "required": ["index", *ANALYSIS_SCHEMA["required"]],
+}
+ANALYSIS_BATCH_SCHEMA = {"type": "array", "items": ANALYSIS_BATCH_ITEM_SCHEMA}
+
+# Upper bounds for one sentiment request: article count keeps the output budget
+# (1024 tokens per article) sane, the character budget keeps the prompt small
+ARTICLES_PER_LLM_CALL = 16
+ANALYSIS_BATCH_MAX_CHARS = 32_000
+
+# Rate limiting and server-side hiccups worth retrying with backoff
+TRANSIENT_GEMINI_ERRORS = (TimeoutError, ResourceExhausted, ServiceUnavailable, DeadlineExceeded, InternalServerError)
+
+# One MAX_CONCURRENT_LLM_CALLS budget per event loop, shared by every generation and embedding call
+_GEMINI_SLOTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
 # For inference
 REPORT_SCHEMA = {
         "type": "object",
@@ -55,72 +102,244 @@ REPORT_SCHEMA = {
         "required": ["overall_summary", "final_sentiment", "recommendation"]
     }
 
+# Per-item cap on impact_reason/headline text fed into the synthesis prompt
+SYNTHESIS_FIELD_MAX_CHARS = 120
+
+# Output budget per analyzed article; batched requests scale it by the article count
+ANALYSIS_MAX_OUTPUT_TOKENS = 1024
+
+ANALYSIS_GENERATION_CONFIG = {
+    "max_output_tokens": ANALYSIS_MAX_OUTPUT_TOKENS,
+    "temperature": 0.0,
+    "response_mime_type": "application/json",
+    "response_schema": ANALYSIS_SCHEMA
+}
+
+ANALYSIS_BATCH_GENERATION_CONFIG = {**ANALYSIS_GENERATION_CONFIG, "response_schema": ANALYSIS_BATCH_SCHEMA}
+
+SYNTHESIS_GENERATION_CONFIG = {
+    "temperature": 0.0,
+    "response_mime_type": "application/json",
+    "response_schema": REPORT_SCHEMA
+}
+
+# Static instructions travel as the model's system instruction, identical on every call;
+# the per-call prompts below carry only the ticker and article/context text
+ANALYSIS_SYSTEM_INSTRUCTION = """
+You are a professional Senior Capital Market Analyst. Analyze the news snippet you are given concerning the named company and provide a structured sentiment analysis.
+
+**STRICT INSTRUCTIONS:**
+1. **ONLY RETURN VALID JSON.** Do not include any other text, greetings, or explanations.
+2. **Sentiment Score:** A number from 1 (Extremely Negative) to 10 (Extremely Positive).
+3. **Impact Reason (Summary):** A short summary (max 20 words) explaining the article and why it received that score.
+"""
+
+ANALYSIS_BATCH_SYSTEM_INSTRUCTION = """
+You are a professional Senior Capital Market Analyst. Analyze each of the numbered news snippets you are given concerning the named company and provide a structured sentiment analysis for every one of them.
+
+**STRICT INSTRUCTIONS:**
+1. **ONLY RETURN A VALID JSON ARRAY** with one object per snippet, in the same order as the numbers. Do not include any other text, greetings, or explanations.
+2. **Index:** The number of the snippet the object analyzes, exactly as given in its [brackets].
+3. **Sentiment Score:** A number from 1 (Extremely Negative) to 10 (Extremely Positive).
+4. **Impact Reason (Summary):** A short summary (max 20 words) explaining the article and why it received that score.
+"""
 
-def embed_articles(articles: List[Dict[str, str]]):
-    genai.configure(api_key=settings.GEMINI_API_KEY.get_secret_value())
-    genai.GenerativeModel('models/text-embedding-004')
+SYNTHESIS_SYSTEM_INSTRUCTION = """
+You are the Chief Investment Strategist. Your task is to synthesize the discrete sentiment analysis results you are given for a stock and provide a final, actionable recommendation.
+
+**FINAL OUTPUT MUST BE A JSON object with the following structure:**
+1. **overall_summary**: A 2-3 sentence summary of the key findings.
+2. **final_sentiment**: The consolidated sentiment (Bullish, Neutral, Bearish).
+3. **recommendation**: The final action (BUY, HOLD, SELL).
+4. **major_risks**: A list of 2 key risks mentioned in the analysis.
+"""
+
+ANALYSIS_PROMPT_TEMPLATE = """
+**COMPANY:** {ticker}
+
+**DATA FOR ANALYSIS:**
+{article_raw_text}
+"""
+
+ANALYSIS_BATCH_PROMPT_TEMPLATE = """
+**COMPANY:** {ticker}
+**NUMBER OF SNIPPETS:** {article_count}
+
+**DATA FOR ANALYSIS:**
+{numbered_articles}
+"""
+
+SYNTHESIS_PROMPT_TEMPLATE = """
+**STOCK:** {ticker}
+
+**DATA SYNTHESIS:**
+{context_text}
+"""
+
+
+async def embed_articles(articles: List[Dict[str, str]], search_query: str, cache: Optional[EmbeddingCache] = None):
+    """
+    Embeds article contents together with the retrieval query.
+    Documents and query share one batched request, and all vectors are
+    L2-normalized so inner product equals cosine similarity downstream.
+
+    Returns:
+        Tuple of (article texts, article embeddings (N, d), query embedding (1, d))
+    """
     article_texts = [article['content'] for article in articles]
 
-    response = genai.embed_content(
-        model='models/text-embedding-004',
-        content=article_texts,
-        task_type="RETRIEVAL_DOCUMENT"
-    )
-    embeddings_list = response['embedding']
-    d = len(embeddings_list[0])
-    embeddings_np = np.array(embeddings_list).astype('float32')
-    index = faiss.IndexFlatL2(d)
-    index.add(embeddings_np)  # type: ignore[arg-type]
-    return article_texts, index
+    requests = [(text, "RETRIEVAL_DOCUMENT") for text in article_texts]
+    requests.append((search_query, "RETRIEVAL_QUERY"))
+    embeddings_np = await embed_texts(requests, cache=cache)
+    embeddings_np /= np.linalg.norm(embeddings_np, axis=1, keepdims=True)
+
+    return article_texts, embeddings_np[:-1], embeddings_np[-1:]
+
+
+async def embed_texts(requests: List[Tuple[str, str]], cache: Optional[EmbeddingCache] = None) -> np.ndarray:
+    """
+    Embeds (text, task_type) pairs and returns a float32 matrix in request order.
+    When a cache is given, only texts without a stored embedding are sent to Gemini.
+    """
+    if cache is None:
+        return await _batch_embed(requests)
+
+    keys = [cache.key_for(text, task_type) for text, task_type in requests]
+    embeddings_by_key = cache.get_many(keys)
+    missing = {key: request for key, request in zip(keys, requests) if key not in embeddings_by_key}
+
+    if missing:
+        fresh = dict(zip(missing.keys(), await _batch_embed(list(missing.values()))))
+        cache.put_many(fresh)
+        embeddings_by_key.update(fresh)
+
+    return np.vstack([embeddings_by_key[key] for key in keys])
 
 
-def search_relevant_articles(ticker_symbol: str, article_texts: list, index: faiss.Index, articles_for_inference) -> list:
+async def _batch_embed(requests: List[Tuple[str, str]]) -> np.ndarray:
     """
-    Search for relevant articles based on a query about stock price and sentiment impact.
+    Sends (text, task_type) pairs to BatchEmbedContents. Unlike genai.embed_content,
+    every request keeps its own task type, so documents and queries share a round-trip.
+    Uses the async gRPC client so the event loop keeps serving while embeddings are
+    computed; batches above the per-call limit are sent concurrently. Rows are
+    written straight into one preallocated float32 matrix.
+    """
+    client = get_default_generative_async_client()
+
+    async def _call(request: genai.protos.BatchEmbedContentsRequest):
+        async with gemini_slots():
+            return await client.batch_embed_contents(request)
+
+    calls = [
+        _call(
+            genai.protos.BatchEmbedContentsRequest(
+                model=EMBEDDING_MODEL,
+                requests=[
+                    genai.protos.EmbedContentRequest(
+                        model=EMBEDDING_MODEL,
+                        content=genai.protos.Content(parts=[genai.protos.Part(text=text)]),
+                        task_type=task_type,
+                        output_dimensionality=EMBEDDING_DIMENSIONS,
+                    )
+                    for text, task_type in requests[start:start + EMBEDDING_BATCH_SIZE]
+                ],
+            )
+        )
+        for start in range(0, len(requests), EMBEDDING_BATCH_SIZE)
+    ]
+
+    embeddings = np.empty((len(requests), EMBEDDING_DIMENSIONS), dtype=np.float32)
+    row = 0
+    for response in await asyncio.gather(*calls):
+        for embedding in response.embeddings:
+            embeddings[row] = embedding.values
+            row += 1
+    return embeddings
+
+
+def search_relevant_articles(article_texts: list, article_embeddings: np.ndarray, query_embedding: np.ndarray,
+                             articles_for_inference) -> list:
+    """
+    Search for the articles closest to the retrieval query embedding.
+    Every set is ranked exactly with a single matrix product: a fetch yields at most
+    a few thousand vectors, far too few for a throwaway ANN index to pay off.
 
     Args:
-        ticker_symbol: Stock ticker symbol
         article_texts: List of article content texts
-        index: FAISS index containing article embeddings
+        article_embeddings: L2-normalized article embeddings, shape (N, d)
+        query_embedding: L2-normalized embedding of the retrieval query, shape (1, d)
         articles_for_inference: Number of articles to filter
 
     Returns:
         List of relevant article texts
     """
-    search_query = f"Significant positive or negative news impacting {ticker_symbol} stock price and sentiment."
-    query_embedding_list = genai.embed_content(
-        model='models/text-embedding-004',
-        content=search_query,
-        task_type="RETRIEVAL_QUERY"
-    )['embedding']
-    query_embedding_np = np.array([query_embedding_list]).astype('float32')
-    D, I = index.search(query_embedding_np, articles_for_inference)
-    relevant_indices = I[0]
+    relevant_indices = top_k_inner_product(article_embeddings, query_embedding[0], articles_for_inference)
     return [article_texts[i] for i in relevant_indices]
 
 
+def top_k_inner_product(embeddings_np: np.ndarray, query: np.ndarray, k: int) -> np.ndarray:
+    """Returns the indices of the k rows with the highest inner product with the query, best first."""
+    scores = embeddings_np @ query
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
 async def analyze_articles_concurrently(
     ticker_symbol: str,
     relevant_articles_text: List[str],
-    gemini_api_key: str,
+    llm_cache: Optional[LLMResponseCache] = None,
 ) -> Dict[str, Any]:
     """
     Run sentiment analysis for multiple articles concurrently and return
     the aggregated analysis data structure expected by print_analysis_report.
+    Articles are packed into as few requests as ARTICLES_PER_LLM_CALL and
+    ANALYSIS_BATCH_MAX_CHARS allow; a chunk whose response does not line up falls
+    back to per-article calls, while a chunk that still fails after retries is
+    reported in errors. With an llm_cache, articles analyzed before are served
+    from it instead of being sent again.
     """
-    tasks = [
-        analyze_single_article(ticker_symbol, {"content": text}, gemini_api_key)
-        for text in relevant_articles_text
-    ]
     results: List[Dict[str, Any]] = []
     errors: List[str] = []
 
-    analyses_results = await asyncio.gather(*tasks, return_exceptions=True)
+    pending: List[Tuple[str, Optional[str]]] = []
+    for text in relevant_articles_text:
+        key = llm_cache.key_for(text) if llm_cache is not None else None
+        cached = llm_cache.lookup(ticker_symbol, key) if key is not None else None
+        if cached is not None:
+            results.append(cached)
+        else:
+            pending.append((text, key))
+
+    async def _chunk(chunk: List[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+        try:
+            news_items = await analyze_batch(ticker_symbol, [text for text, _ in chunk])
+        except ValueError as e:
+            # Only a malformed or misaligned answer is worth splitting up; transient errors were
+            # already retried by generate_content and fail the chunk instead of multiplying calls
+            logger.warning("⚠️ Batched analysis failed, retrying %d articles one by one: %s", len(chunk), e)
+            return list(await asyncio.gather(
+                *(analyze_single_article(ticker_symbol, {"content": text}, llm_cache) for text, _ in chunk)
+            ))
+
+        if llm_cache is not None:
+            for (_, key), item in zip(chunk, news_items):
+                llm_cache.store(ticker_symbol, key, item)
+        return [{"news_items": [item]} for item in news_items]
+
+    tasks = [_chunk(chunk) for chunk in pack_batches(pending, ARTICLES_PER_LLM_CALL, ANALYSIS_BATCH_MAX_CHARS)]
+
+    analyses_results: List[Any] = []
+    for chunk_result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(chunk_result, Exception):
+            analyses_results.append(chunk_result)
+        else:
+            analyses_results.extend(chunk_result)
 
     for result in analyses_results:
         if isinstance(result, Exception):
             errors.append(str(result))
-            print(f"⚠️ Task error: {result}", file=sys.stderr)
+            logger.warning("⚠️ Task error: %s", result)
             continue
 
         if "news_items" in result:
@@ -130,52 +349,89 @@ async def analyze_articles_concurrently(
 
     return {
         "ticker": ticker_symbol,
-        "analysis_date": time.strftime("%Y-%m-%d"),
+        "analysis_date": date.today().isoformat(),
         "news_items": results,
         "errors": errors,
         "errors_count": len(errors),
     }
 
-async def analyze_single_article(ticker: str, article: Dict[str, str], api_key: str) -> Dict[str, Any]:
+
+def pack_batches(items: List[Tuple[str, Any]], max_items: int, max_chars: int) -> List[List[Tuple[str, Any]]]:
     """
-    Analyzes a single news article for sentiment using Gemini API and returns a structured JSON
-    ready for merging.
+    Greedily groups (text, payload) pairs in order so that no group exceeds max_items
+    entries or max_chars of text. A single text longer than max_chars gets its own group.
     """
-    article_raw_text = (
-        f"TITLE: {article.get('title', 'N/A')}\n"
-        f"CONTENT: {article.get('content', 'N/A')}"
+    batches: List[List[Tuple[str, Any]]] = []
+    current: List[Tuple[str, Any]] = []
+    current_chars = 0
+
+    for item in items:
+        size = len(item[0])
+        if current and (len(current) == max_items or current_chars + size > max_chars):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(item)
+        current_chars += size
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def analyze_batch(ticker: str, articles: List[str]) -> List[Dict[str, Any]]:
+    """
+    Analyzes several articles in one Gemini request and returns one news item per
+    article, in input order. Items are matched to articles by the index each one
+    echoes, not by position; raises ValueError unless every article is answered once.
+    """
+    numbered_articles = "\n".join(f"[{i}] {text}" for i, text in enumerate(articles, start=1))
+    prompt = ANALYSIS_BATCH_PROMPT_TEMPLATE.format(
+        ticker=ticker, article_count=len(articles), numbered_articles=numbered_articles
     )
 
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.5-flash')
+    generation_config = {
+        **ANALYSIS_BATCH_GENERATION_CONFIG, "max_output_tokens": ANALYSIS_MAX_OUTPUT_TOKENS * len(articles)
+    }
+
+    response = await generate_content(prompt, generation_config, ANALYSIS_BATCH_SYSTEM_INSTRUCTION)
+    news_items = parse_json_response(response.text)
+
+    if not isinstance(news_items, list) or len(news_items) != len(articles):
+        raise ValueError(f"expected {len(articles)} analyses, got {news_items!r:.200}")
 
-    prompt = f"""
-    You are a professional Senior Capital Market Analyst. Analyze the following news snippet concerning the company {ticker} and provide a structured sentiment analysis.
+    by_index = {item.get("index"): item for item in news_items if isinstance(item, dict)}
+    expected = range(1, len(articles) + 1)
+    if set(by_index) != set(expected):
+        raise ValueError(f"expected analyses for snippets 1-{len(articles)}, got {news_items!r:.200}")
+    return [{k: v for k, v in by_index[i].items() if k != "index"} for i in expected]
 
-    **STRICT INSTRUCTIONS:**
-    1. **ONLY RETURN VALID JSON.** Do not include any other text, greetings, or explanations.
-    2. **Sentiment Score:** A number from 1 (Extremely Negative) to 10 (Extremely Positive).
-    3. **Impact Reason (Summary):** A short summary (max 20 words) explaining the article and why it received that score.
 
-    **DATA FOR ANALYSIS:**
-    {article_raw_text}
+async def analyze_single_article(ticker: str, article: Dict[str, str],
+                                 llm_cache: Optional[LLMResponseCache] = None) -> Dict[str, Any]:
     """
+    Analyzes a single news article for sentiment using Gemini API and returns a structured JSON
+    ready for merging. With a cache, the stored analysis of the same article content is
+    returned instead of calling Gemini.
+    """
+    key = llm_cache.key_for(article.get('content', 'N/A')) if llm_cache is not None else None
+    if llm_cache is not None:
+        cached = llm_cache.lookup(ticker, key)
+        if cached is not None:
+            return {"news_items": [cached]}
+
+    article_raw_text = (
+        f"TITLE: {article.get('title', 'N/A')}\n"
+        f"CONTENT: {article.get('content', 'N/A')}"
+    )
+
+    prompt = ANALYSIS_PROMPT_TEMPLATE.format(ticker=ticker, article_raw_text=article_raw_text)
 
     try:
-        generation_config = {
-            "max_output_tokens": 1024,
-            "temperature": 0.0,
-            "response_mime_type": "application/json",
-            "response_schema": ANALYSIS_SCHEMA
-        }
-
-        response = await model.generate_content_async(
-            prompt,
-            generation_config=generation_config
-        )
+        response = await generate_content(prompt, ANALYSIS_GENERATION_CONFIG, ANALYSIS_SYSTEM_INSTRUCTION)
 
-        json_text = response.text.strip().replace('```json', '').replace('```', '')
-        result_dict = json.loads(json_text)
+        result_dict = parse_json_response(response.text)
+        if llm_cache is not None:
+            llm_cache.store(ticker, key, result_dict)
         return {"news_items": [result_dict]}
 
     except Exception as e:
@@ -183,33 +439,51 @@ async def analyze_single_article(ticker: str, article: Dict[str, str], api_key:
                 "raw_response": response.text if 'response' in locals() else 'N/A'}
 
 
-async def synthesize_report(ticker: str, analyzed_news_items: List[Dict[str, Any]], api_key: str) -> Dict[str, str]:
-    context_text = "Analysis Results from Individual Articles:\n"
-    for item in analyzed_news_items:
-        context_text += f"- Score {item['sentiment_score']}/10 ({item['sentiment_category']}): {item['impact_reason']} (Source: {item['headline']})\n"
-
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.5-flash')
+async def synthesize_report(ticker: str, analyzed_news_items: List[Dict[str, Any]]) -> Dict[str, str]:
+    lines = [
+        f"- Score {item['sentiment_score']}/10 ({item['sentiment_category']}): "
+        f"{item['impact_reason'][:SYNTHESIS_FIELD_MAX_CHARS]} (Source: {item['headline'][:SYNTHESIS_FIELD_MAX_CHARS]})"
+        for item in analyzed_news_items
+    ]
+    context_text = "Analysis Results from Individual Articles:\n" + "\n".join(lines)
 
-    prompt = f"""
-    You are the Chief Investment Strategist. Your task is to synthesize the following discrete sentiment analysis results for the stock {ticker} and provide a final, actionable recommendation.
+    prompt = SYNTHESIS_PROMPT_TEMPLATE.format(ticker=ticker, context_text=context_text)
 
-    **DATA SYNTHESIS:**
-    {context_text}
+    response = await generate_content(prompt, SYNTHESIS_GENERATION_CONFIG, SYNTHESIS_SYSTEM_INSTRUCTION)
+    return parse_json_response(response.text)
 
-    **FINAL OUTPUT MUST BE A JSON object with the following structure:**
-    1. **overall_summary**: A 2-3 sentence summary of the key findings.
-    2. **final_sentiment**: The consolidated sentiment (Bullish, Neutral, Bearish).
-    3. **recommendation**: The final action (BUY, HOLD, SELL).
-    4. **major_risks**: A list of 2 key risks mentioned in the analysis.
 
+@retry(
+    wait=wait_exponential(multiplier=0.5, max=8),
+    stop=stop_after_attempt(4),
+    retry=retry_if_exception_type(TRANSIENT_GEMINI_ERRORS),
+    reraise=True
+)
+async def generate_content(prompt: str, generation_config: Dict[str, Any], system_instruction: Optional[str] = None):
     """
+    Calls the shared Flash model, retrying transient failures with exponential backoff.
+    Each attempt takes a gemini_slots() slot; backoff sleeps don't hold one.
+    """
+    model = get_model(FLASH_MODEL, system_instruction)
+    async with gemini_slots():
+        return await model.generate_content_async(prompt, generation_config=generation_config)
 
-    generation_config = {
-        "temperature": 0.0,
-        "response_mime_type": "application/json",
-        "response_schema": REPORT_SCHEMA
-    }
 
-    response = await model.generate_content_async(prompt, generation_config=generation_config)
-    return json.loads(response.text)
+def gemini_slots() -> asyncio.Semaphore:
+    """The running loop's cap on in-flight Gemini requests (MAX_CONCURRENT_LLM_CALLS)."""
+    loop = asyncio.get_running_loop()
+    semaphore = _GEMINI_SLOTS.get(loop)
+    if semaphore is None:
+        semaphore = _GEMINI_SLOTS[loop] = asyncio.Semaphore(settings.MAX_CONCURRENT_LLM_CALLS)
+    return semaphore
+
+
+def parse_json_response(text: str) -> Any:
+    """
+    Parses a JSON-mode Gemini response. With response_mime_type="application/json"
+    there are no markdown fences, so stripping them is only a fallback.
+    """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return orjson.loads(text.strip().replace('```json', '').replace('```', ''))
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Shared Gemini client setup.
+
+genai.configure() discards every cached service client, so calling it per request
+also throws away the open gRPC channel. Configure once per key and reuse models.
+"""
+
+import functools
+from typing import Optional
+
+import google.generativeai as genai
+
+from src.core.config import settings
+
+EMBEDDING_MODEL = 'models/text-embedding-004'
+# Truncated embedding size requested from the API (the model's native size is 768)
+EMBEDDING_DIMENSIONS = 256
+FLASH_MODEL = 'gemini-2.5-flash'
+
+_configured_key = None
+
+
+def configure_gemini(api_key: str):
+    """Configures genai for api_key; repeated calls with the same key are no-ops."""
+    global _configured_key
+    if api_key == _configured_key:
+        return
+
+    genai.configure(api_key=api_key)
+    _configured_key = api_key
+
+
+@functools.lru_cache(maxsize=8)
+def get_model(name: str, system_instruction: Optional[str] = None) -> genai.GenerativeModel:
+    """Returns a shared GenerativeModel instance for the given model name and system instruction."""
+    return genai.GenerativeModel(name, system_instruction=system_instruction)
+
+
+configure_gemini(settings.GEMINI_API_KEY.get_secret_value())
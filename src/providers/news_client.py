@@ -1,69 +1,123 @@
 #!/usr/bin/env python3
 
-import json
+import asyncio
+import contextlib
 import os
 import time
 import httpx
 import logging
-from typing import List, Dict, Any
+import orjson
+from typing import List, Dict, Any, Optional, Set, Tuple
 
+from cachetools import TLRUCache
 from tenacity import stop_after_attempt, retry, wait_fixed
 
 from src.core.interfaces import INewsProvider
 
 logger = logging.getLogger(__name__)
 
+NEWS_API_TIMEOUT = httpx.Timeout(10.0)
+NEWS_API_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+# Retries of failed connection attempts, handled inside the transport before any request is sent
+NEWS_API_CONNECT_RETRIES = 3
+# Bodies above this size are parsed on a worker thread instead of the event loop
+INLINE_PARSE_MAX_BYTES = 64 * 1024
+
+
 class NewsAPIClient(INewsProvider):
     def __init__(self, api_key: str):
         self.api_key = api_key
+        # One pooled client per provider, so repeated fetches reuse the open TLS connection
+        transport = httpx.AsyncHTTPTransport(limits=NEWS_API_LIMITS, retries=NEWS_API_CONNECT_RETRIES)
+        self._client = httpx.AsyncClient(transport=transport, timeout=NEWS_API_TIMEOUT)
 
     async def fetch_articles(self, ticker: str, count: int) -> List[Dict[str, str]]:
-        return await fetch_articles_raw(ticker, self.api_key, count)
+        return await fetch_articles_raw(ticker, self.api_key, count, client=self._client)
+
+    async def aclose(self):
+        """Closes the pooled HTTP connections."""
+        await self._client.aclose()
+
+
+# Cache directories already created by this process
+_PREPARED_DIRS: Set[str] = set()
 
 
 class CachedNewsProvider(INewsProvider):
-    def __init__(self, inner_provider: INewsProvider, cache_dir: str = "data/cache", ttl_seconds: int = 3600):
+    """
+    Two-level news cache: an in-process LRU in front of per-ticker JSON files.
+    Memory entries expire together with the file they came from, so promoting a
+    disk hit never extends its TTL.
+    """
+
+    def __init__(self, inner_provider: INewsProvider, cache_dir: str = "data/cache", ttl_seconds: int = 3600,
+                 memory_size: int = 256):
         self.inner_provider = inner_provider
         self.cache_dir = cache_dir
         self.ttl_seconds = ttl_seconds
+        # (ticker, count) -> (expires_at, articles)
+        self._memory: TLRUCache = TLRUCache(maxsize=memory_size, ttu=_entry_expiry, timer=time.time)
 
-        if not os.path.exists(self.cache_dir):
+        if self.cache_dir not in _PREPARED_DIRS:
             os.makedirs(self.cache_dir, exist_ok=True)
+            _PREPARED_DIRS.add(self.cache_dir)
 
     async def fetch_articles(self, ticker: str, count: int) -> List[Dict[str, str]]:
+        entry = self._memory.get((ticker, count))
+        if entry is not None:
+            logger.info("⚡ Serving %s news from memory cache...", ticker)
+            return entry[1]
+
         cache_file = os.path.join(self.cache_dir, f"{ticker}_news.json")
 
-        if self._is_cache_valid(cache_file):
-            logger.info(f"📦 Loading {ticker} news from local cache...")
-            return self._load_from_cache(cache_file)
+        expires_at = self._cache_expiry(cache_file)
+        if expires_at is not None:
+            logger.info("📦 Loading %s news from local cache...", ticker)
+            articles = self._load_from_cache(cache_file)
+            if articles:
+                self._memory[(ticker, count)] = (expires_at, articles)
+            return articles
 
-        logger.info(f"🌐 Missed cache. Asking inner provider for {ticker}...")
+        logger.info("🌐 Missed cache. Asking inner provider for %s...", ticker)
         articles = await self.inner_provider.fetch_articles(ticker, count)
 
         if articles:
             self._save_to_cache(cache_file, articles)
+            self._memory[(ticker, count)] = (time.time() + self.ttl_seconds, articles)
 
         return articles
 
-    def _is_cache_valid(self, filepath: str) -> bool:
-        if not os.path.exists(filepath):
-            return False
-        file_age = time.time() - os.path.getmtime(filepath)
-        return file_age < self.ttl_seconds
+    def _cache_expiry(self, filepath: str) -> Optional[float]:
+        """Returns when the cache file expires, or None if it is missing or already stale (one stat call)."""
+        try:
+            expires_at = os.stat(filepath).st_mtime + self.ttl_seconds
+        except OSError:
+            # Missing or unreadable (e.g. PermissionError): fall through to the network
+            return None
+        return expires_at if time.time() < expires_at else None
 
     def _load_from_cache(self, filepath: str) -> List[Dict]:
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(filepath, 'rb') as f:
+                return orjson.loads(f.read())
         except:
             return []
 
     def _save_to_cache(self, filepath: str, data: List[Dict]):
+        # Write aside and rename so a concurrent reader never sees a half-written file
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(data))
+            os.replace(tmp_path, filepath)
         except Exception as e:
-            logger.warning(f"⚠️ Cache save failed: {e}")
+            logger.warning("⚠️ Cache save failed: %s", e)
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+
+def _entry_expiry(_key: Any, entry: Tuple[float, List[Dict[str, str]]], _now: float) -> float:
+    return entry[0]
 
 
 class AutoRetryProvider(INewsProvider):
@@ -76,33 +130,35 @@ class AutoRetryProvider(INewsProvider):
         self.stats = stats
         self.max_retries = max_retries
         self.wait_seconds = wait_seconds
+        # Built once; tenacity copies the policy per call, so concurrent fetches don't share state
+        self._safe_fetch = retry(
+            stop=stop_after_attempt(max_retries),
+            wait=wait_fixed(wait_seconds),
+            after=self._update_retry_stats
+        )(inner_provider.fetch_articles)
+
+    def _update_retry_stats(self, retry_state):
+        retries = retry_state.attempt_number - 1
+        if retries > 0:
+            logger.warning("⚠️ Retry #%d triggered for %s...", retries, retry_state.args[0])
+            self.stats.update('retry_count', retries)
 
     async def fetch_articles(self, ticker: str, count: int) -> List[Dict[str, str]]:
-
-        def update_retry_stats(retry_state):
-            retries = retry_state.attempt_number - 1
-            if retries > 0:
-                logger.warning(f"⚠️ Retry #{retries} triggered for {ticker}...")
-                self.stats.update('retry_count', retries)
-
-        logger.info(f"🛡️ Entering retry protection zone for {ticker}...")
-
-        @retry(
-            stop=stop_after_attempt(self.max_retries),
-            wait=wait_fixed(self.wait_seconds),
-            after=update_retry_stats
-        )
-        async def _safe_fetch():
-            return await self.inner_provider.fetch_articles(ticker, count)
+        logger.info("🛡️ Entering retry protection zone for %s...", ticker)
 
         try:
-            return await _safe_fetch()
+            return await self._safe_fetch(ticker, count)
         except Exception as e:
-            logger.error(f"💀 All retry attempts failed: {e}")
+            logger.error("💀 All retry attempts failed: %s", e)
             return []
 
 
-async def fetch_articles_raw(ticker_symbol: str, news_api_key: str, num_results) -> List[Dict[str, str]]:
+async def fetch_articles_raw(ticker_symbol: str, news_api_key: str, num_results,
+                             client: Optional[httpx.AsyncClient] = None) -> List[Dict[str, str]]:
+    if client is None:
+        async with httpx.AsyncClient(timeout=NEWS_API_TIMEOUT) as own_client:
+            return await fetch_articles_raw(ticker_symbol, news_api_key, num_results, client=own_client)
+
     url = "https://newsapi.org/v2/everything"
     params = {
         'q': f"{ticker_symbol} stock",
@@ -113,28 +169,24 @@ async def fetch_articles_raw(ticker_symbol: str, news_api_key: str, num_results)
     }
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        body = response.content
+        if len(body) > INLINE_PARSE_MAX_BYTES:
+            data = await asyncio.to_thread(orjson.loads, body)
+        else:
+            data = orjson.loads(body)
 
         if data['status'] != 'ok':
-            logger.error(f"NewsAPI Error: {data.get('message', 'Unknown error')}")
+            logger.error("NewsAPI Error: %s", data.get('message', 'Unknown error'))
             return []
 
-        articles = data.get('articles', [])
-        filtered_articles = []
-        for article in articles:
-            if article.get('content') and article.get('title'):
-                filtered_article = {
-                    'author': article.get('author', ''),
-                    'title': article.get('title', ''),
-                    'content': article.get('content', '')
-                }
-                filtered_articles.append(filtered_article)
-
-        return filtered_articles
+        return [
+            {'author': article.get('author', ''), 'title': title, 'content': content}
+            for article in data.get('articles', [])
+            if (content := article.get('content')) and (title := article.get('title'))
+        ]
 
     except httpx.HTTPError as e:
-        logger.error(f"Network Error fetching search results: {e}")
+        logger.error("Network Error fetching search results: %s", e)
         return []
@@ -0,0 +1,54 @@
+import hashlib
+import re
+from typing import Dict, List
+
+import numpy as np
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+# Fingerprints this close (in differing bits) are treated as the same story
+MAX_HAMMING_DISTANCE = 3
+
+_BIT_POSITIONS = np.arange(SIMHASH_BITS, dtype=np.uint64)
+# NewsAPI truncates content and appends the remaining length, e.g. "[+2345 chars]"
+_TRUNCATION_MARKER = re.compile(r"\[\+\d+ chars\]")
+_WORD = re.compile(r"\w+")
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> int:
+    """
+    64-bit SimHash over word shingles. Texts that share most of their shingles
+    get fingerprints differing in only a few bits.
+    """
+    words = _WORD.findall(_TRUNCATION_MARKER.sub("", text).lower())
+    shingles = {" ".join(words[i:i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))}
+
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little') for s in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+    bits = (hashes[:, None] >> _BIT_POSITIONS) & np.uint64(1)
+    votes = 2 * bits.sum(axis=0, dtype=np.int64) - len(hashes)
+
+    fingerprint = 0
+    for position in np.flatnonzero(votes > 0):
+        fingerprint |= 1 << int(position)
+    return fingerprint
+
+
+def dedupe_articles(articles: List[Dict[str, str]], max_distance: int = MAX_HAMMING_DISTANCE) -> List[Dict[str, str]]:
+    """
+    Drops near-duplicate articles (e.g. one wire story syndicated by several outlets),
+    keeping the first article of each cluster in the original order.
+    """
+    kept: List[Dict[str, str]] = []
+    fingerprints: List[int] = []
+
+    for article in articles:
+        fingerprint = simhash(f"{article.get('title', '')} {article.get('content', '')}")
+        if any((fingerprint ^ seen).bit_count() <= max_distance for seen in fingerprints):
+            continue
+        fingerprints.append(fingerprint)
+        kept.append(article)
+
+    return kept
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import sqlite3
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# SQLite caps the number of bound parameters per statement.
+_SQL_BATCH_SIZE = 500
+
+
+class EmbeddingCache:
+    """
+    Persistent content-hash -> embedding store backed by SQLite.
+    A cache instance is bound to one embedding space (model + output dimensionality);
+    both are part of every key, so switching models never returns stale vectors.
+    Vectors are stored as raw float16 bytes, half the size of float32 at a precision
+    loss far below what cosine ranking can notice; hits are widened back to float32.
+    """
+
+    def __init__(self, model: str, dimensions: Optional[int] = None,
+                 db_path: str = os.path.join('data', 'cache', 'embeddings.db')):
+        self.model = model
+        self.dimensions = dimensions
+        self.db_path = db_path
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (hash TEXT PRIMARY KEY, dim INTEGER NOT NULL, vec BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def key_for(self, text: str, task_type: str = "RETRIEVAL_DOCUMENT") -> str:
+        """
+        Returns the cache key (SHA-256 hex digest) for a piece of content.
+        Task type is part of the key since it changes the embedding.
+        """
+        material = f"{self.model}\0{self.dimensions}\0{task_type}\0{text}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Returns the cached embeddings for the given keys; missing keys are omitted."""
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+
+        for start in range(0, len(unique_keys), _SQL_BATCH_SIZE):
+            batch = unique_keys[start:start + _SQL_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT hash, dim, vec FROM embeddings WHERE hash IN ({placeholders})", batch
+            )
+            for key, dim, blob in rows:
+                vec = np.frombuffer(blob, dtype=np.float16)
+                # Rows written in another format decode to the wrong length and count as misses
+                if vec.size == dim:
+                    found[key] = vec.astype(np.float32)
+
+        return found
+
+    def put_many(self, embeddings: Dict[str, np.ndarray]):
+        """Stores embeddings, replacing any unreadable row under the same key."""
+        rows = []
+        for key, vec in embeddings.items():
+            vec = np.asarray(vec, dtype=np.float16)
+            rows.append((key, vec.size, vec.tobytes()))
+
+        self._conn.executemany("INSERT OR REPLACE INTO embeddings (hash, dim, vec) VALUES (?, ?, ?)", rows)
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
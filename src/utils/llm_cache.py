@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Responses older than this are never served and are dropped on the next save
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+# Newest rows kept per namespace; older ones are evicted first
+DEFAULT_MAX_ROWS = 512
+
+
+class LLMResponseCache:
+    """
+    Persistent content-hash -> LLM response store.
+    Only byte-identical inputs share a response: two articles that embed close together
+    can still carry opposite news, so similarity is never good enough here. Like the
+    EmbeddingCache, the model is part of every key. Each namespace (one per ticker) is
+    a JSON file, named by the namespace's hash, of [key, created_at, response] rows,
+    oldest first, holding at most max_rows rows younger than ttl_seconds.
+    """
+
+    def __init__(self, model: str, cache_dir: str = os.path.join('data', 'cache', 'llm'),
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_rows: int = DEFAULT_MAX_ROWS):
+        self.model = model
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        # Per namespace: key -> (created_at, response), in insertion order
+        self._namespaces: Dict[str, Dict[str, List[Any]]] = {}
+        self._dirty: set = set()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key_for(self, text: str) -> str:
+        """Returns the cache key (SHA-256 hex digest) for an LLM input."""
+        material = f"{self.model}\0{text}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def lookup(self, namespace: str, key: str) -> Optional[Any]:
+        """Returns the fresh response stored under key, else None."""
+        row = self._load(namespace).get(key)
+        # Rows can expire while a long-running process holds the namespace
+        if row is None or row[0] < time.time() - self.ttl_seconds:
+            return None
+        return row[1]
+
+    def store(self, namespace: str, key: str, response: Any):
+        entries = self._load(namespace)
+        # Re-inserting moves the key to the newest end
+        entries.pop(key, None)
+        entries[key] = [time.time(), response]
+        self._prune(entries)
+        self._dirty.add(namespace)
+
+    async def save(self):
+        """
+        Writes every namespace changed since the last save to disk.
+        Rows are serialized on the caller's loop, where store() mutates them; only the
+        file writes run in a worker thread.
+        """
+        payloads: Dict[str, bytes] = {}
+        for namespace in list(self._dirty):
+            entries = self._namespaces[namespace]
+            self._prune(entries)
+            rows = [[key, created_at, response] for key, (created_at, response) in entries.items()]
+            try:
+                payloads[namespace] = orjson.dumps({"rows": rows})
+            except TypeError as e:
+                logger.warning("⚠️ LLM cache save failed for %s: %s", namespace, e)
+        self._dirty.difference_update(payloads)
+
+        # Namespaces whose write failed stay dirty for the next save
+        self._dirty.update(await asyncio.to_thread(self._write, payloads))
+
+    def _write(self, payloads: Dict[str, bytes]) -> List[str]:
+        failed = []
+        for namespace, payload in payloads.items():
+            try:
+                with open(self._path(namespace), 'wb') as f:
+                    f.write(payload)
+            except OSError as e:
+                logger.warning("⚠️ LLM cache save failed for %s: %s", namespace, e)
+                failed.append(namespace)
+        return failed
+
+    def _prune(self, entries: Dict[str, List[Any]]):
+        """Drops expired rows, then the oldest ones beyond max_rows."""
+        cutoff = time.time() - self.ttl_seconds
+        for key in [key for key, (created_at, _) in entries.items() if created_at < cutoff]:
+            del entries[key]
+        for key in list(entries)[:-self.max_rows or None]:
+            del entries[key]
+
+    def _load(self, namespace: str) -> Dict[str, List[Any]]:
+        entries = self._namespaces.get(namespace)
+        if entries is not None:
+            return entries
+
+        entries = {}
+        try:
+            with open(self._path(namespace), 'rb') as f:
+                rows = orjson.loads(f.read()).get("rows", [])
+            # Files from an older layout don't have [key, created_at, response] rows; start over then
+            for key, created_at, response in rows:
+                entries[key] = [float(created_at), response]
+            self._prune(entries)
+        except (OSError, ValueError, TypeError, AttributeError):
+            entries = {}
+
+        self._namespaces[namespace] = entries
+        return entries
+
+    def _path(self, namespace: str) -> str:
+        # Namespaces come from user input (tickers); hashing keeps "../x" inside cache_dir
+        digest = hashlib.sha256(namespace.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest + ".json")
@@ -1,9 +1,15 @@
+import atexit
 import csv
+import io
 import os
 import sys
 import time
-import json
-from typing import Dict, Any, List
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Set
+
+import numpy as np
+import orjson
 
 CSV_HEADERS = [
     'run_id', 'run_timestamp', 'analysis_date', 'ticker',
@@ -15,21 +21,33 @@ CSV_HEADERS = [
     'final_sentiment', 'final_recommendation', 'major_risks_json',
     'total_runtime_sec', 'run_status', 'error_stage', 'error_message'
 ]
+_HEADER_INDEX = {header: i for i, header in enumerate(CSV_HEADERS)}
+# Report directories already created by this process
+_PREPARED_DIRS: Set[str] = set()
 
 
 class StatsCollector:
     """
     Class for collecting and managing run statistics, saving them to a CSV file.
+    With filename=None rows are kept in memory (see csv_text) and nothing touches the disk.
     """
 
-    def __init__(self, filename: str = os.path.join('data', 'reports', 'run_stats.csv')):
+    def __init__(self, filename: Optional[str] = os.path.join('data', 'reports', 'run_stats.csv')):
         self.filename = filename
         self.stats: Dict[str, Any] = {}
         self.start_time = time.time()
+        self._start_ns = time.perf_counter_ns()
+        # Opened on the first finalize() and kept for the process lifetime
+        self._file = None
+        self._writer = None
+
+        if self.filename is None:
+            return
 
         directory = os.path.dirname(self.filename)
-        if directory:
+        if directory and directory not in _PREPARED_DIRS:
             os.makedirs(directory, exist_ok=True)
+            _PREPARED_DIRS.add(directory)
         self._initialize_csv()
 
     def _initialize_csv(self):
@@ -66,6 +84,10 @@ class StatsCollector:
         """Updates a specific statistic key."""
         self.stats[key] = value
 
+    def update_many(self, **values: Any):
+        """Updates several statistics in one dict merge."""
+        self.stats.update(values)
+
     def update_error(self, stage: str, message: str):
         """Updates the run status when an error occurs."""
         self.stats['run_status'] = 'FAILED'
@@ -74,49 +96,98 @@ class StatsCollector:
         self.finalize()
 
     def finalize(self, status: str = 'OK'):
-        """Calculates final metrics and writes the complete row to CSV."""
-        self.stats['total_runtime_sec'] = round(time.time() - self.start_time, 3)
+        """Calculates final metrics and writes the complete row to CSV (missing stats become 'N/A')."""
+        self.stats['total_runtime_sec'] = round((time.perf_counter_ns() - self._start_ns) / 1e9, 3)
         if self.stats['run_status'] == 'IN_PROGRESS':
             self.stats['run_status'] = status
 
         try:
-            with open(self.filename, mode='a', newline='', encoding='utf-8') as file:
-                writer = csv.DictWriter(file, fieldnames=CSV_HEADERS)
-                row = {header: self.stats.get(header, 'N/A') for header in CSV_HEADERS}
-                writer.writerow(row)
-            print(f"📊 [STATS] Run results saved to {self.filename} ({self.stats['run_id']}).")
+            row = ['N/A'] * len(CSV_HEADERS)
+            for key, value in self.stats.items():
+                index = _HEADER_INDEX.get(key)
+                if index is not None:
+                    row[index] = value
+            self._row_writer().writerow(row)
+            self._file.flush()
+            print(f"📊 [STATS] Run results saved to {self.filename or 'memory'} ({self.stats['run_id']}).")
         except Exception as e:
             print(f"🛑 CRITICAL ERROR: Could not write statistics to CSV: {e}", file=sys.stderr)
 
+    def _row_writer(self):
+        """Returns the shared append-mode writer; rows are lists in CSV_HEADERS order."""
+        if self._writer is None:
+            if self.filename is None:
+                self._file = io.StringIO(newline='')
+                self._writer = csv.writer(self._file)
+                self._writer.writerow(CSV_HEADERS)
+            else:
+                self._file = open(self.filename, mode='a', newline='', encoding='utf-8')
+                atexit.register(self._file.close)
+                self._writer = csv.writer(self._file)
+        return self._writer
+
+    def csv_text(self) -> str:
+        """CSV (header included) written so far by an in-memory collector."""
+        if self.filename is not None:
+            raise ValueError("csv_text() is only available when filename is None")
+        self._row_writer()
+        return self._file.getvalue()
+
     def calculate_analysis_metrics(self, analysis_data: Dict[str, Any], analysis_duration_sec: float):
         """Calculates and updates metrics based on the analysis results."""
         news_items: List[Dict[str, Any]] = analysis_data.get('news_items', [])
 
-        self.update('analysis_duration_sec', round(analysis_duration_sec, 3))
-        self.update('relevant_articles_found', len(news_items))
-        self.update('analysis_success_count', len(news_items))
+        self.update_many(
+            analysis_duration_sec=round(analysis_duration_sec, 3),
+            relevant_articles_found=len(news_items),
+            analysis_success_count=len(news_items),
+        )
 
         if not news_items:
             return
 
-        total_score = sum(item.get('sentiment_score', 0) for item in news_items)
-        self.update('sentiment_score_avg', round(total_score / len(news_items), 2))
-        self.update('sentiment_score_min', min(item.get('sentiment_score', 0) for item in news_items))
-        self.update('sentiment_score_max', max(item.get('sentiment_score', 0) for item in news_items))
-
-        positive_count = sum(1 for item in news_items if item.get('sentiment_category') == 'POSITIVE')
-        negative_count = sum(1 for item in news_items if item.get('sentiment_category') == 'NEGATIVE')
-        neutral_count = sum(1 for item in news_items if item.get('sentiment_category') == 'NEUTRAL')
+        scores = np.fromiter(
+            (item.get('sentiment_score', 0) for item in news_items), dtype=np.int64, count=len(news_items)
+        )
+        categories = Counter(item.get('sentiment_category') for item in news_items)
 
-        self.update('news_items_positive_count', positive_count)
-        self.update('news_items_negative_count', negative_count)
-        self.update('news_items_neutral_count', neutral_count)
+        self.update_many(
+            sentiment_score_avg=round(float(scores.mean()), 2),
+            sentiment_score_min=int(scores.min()),
+            sentiment_score_max=int(scores.max()),
+            news_items_positive_count=categories['POSITIVE'],
+            news_items_negative_count=categories['NEGATIVE'],
+            news_items_neutral_count=categories['NEUTRAL'],
+        )
 
     def calculate_synthesis_metrics(self, recommendation_data: Dict[str, Any], synthesis_duration_sec: float):
         """Updates metrics based on the final synthesis results."""
-        self.update('synthesis_duration_sec', round(synthesis_duration_sec, 3))
-        self.update('final_sentiment', recommendation_data.get('final_sentiment', 'N/A'))
-        self.update('final_recommendation', recommendation_data.get('recommendation', 'N/A'))
-
         major_risks = recommendation_data.get('major_risks', [])
-        self.update('major_risks_json', json.dumps(major_risks))
+        self.update_many(
+            synthesis_duration_sec=round(synthesis_duration_sec, 3),
+            final_sentiment=recommendation_data.get('final_sentiment', 'N/A'),
+            final_recommendation=recommendation_data.get('recommendation', 'N/A'),
+            major_risks_json=orjson.dumps(major_risks).decode('utf-8'),
+        )
+
+
+class StageTimer:
+    """Elapsed time of a `timed` block, filled in when the block exits."""
+    seconds: float = 0.0
+
+
+@contextmanager
+def timed(stats: Optional[StatsCollector] = None, key: Optional[str] = None):
+    """
+    Times the enclosed block with the monotonic perf_counter_ns clock.
+    Yields a StageTimer; when stats and key are given, the duration in seconds
+    (rounded like the other *_duration_sec metrics) is also recorded under key.
+    """
+    timer = StageTimer()
+    start = time.perf_counter_ns()
+    try:
+        yield timer
+    finally:
+        timer.seconds = (time.perf_counter_ns() - start) / 1e9
+        if stats is not None and key is not None:
+            stats.update(key, round(timer.seconds, 3))
@@ -1,3 +1,4 @@
+import importlib.util
 import sys
 import os
 from unittest.mock import patch
@@ -12,6 +13,7 @@ os.environ["ARTICLES_TO_INFERENCE"] = "2"
 # Add the root directory to PATH so tests can find src
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+
 @pytest.fixture(autouse=True)
 def mock_logger_file_handler():
     """
@@ -19,4 +21,12 @@ def mock_logger_file_handler():
     """
     with patch("logging.FileHandler") as MockHandler:
         MockHandler.return_value.level = 0
-        yield
\ No newline at end of file
+        yield
+
+
+if importlib.util.find_spec("uvloop") is not None:
+    import uvloop
+
+    def pytest_asyncio_loop_factories(config, item):
+        """Runs the async tests on uvloop where it is installed (stock asyncio loop otherwise)."""
+        return {"uvloop": uvloop.new_event_loop}
@@ -0,0 +1,133 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from google.api_core.exceptions import ResourceExhausted
+import numpy as np
+import pytest
+from tenacity import wait_none
+
+from src.core.config import settings
+from src.providers.analysis_client import (
+    analyze_articles_concurrently, analyze_batch, generate_content, pack_batches, search_relevant_articles, top_k_inner_product, parse_json_response
+)
+
+
+def test_top_k_inner_product_orders_best_first():
+    """Tests that the most similar rows come back in descending similarity"""
+    embeddings = np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]], dtype=np.float32)
+
+    top = top_k_inner_product(embeddings, np.array([1.0, 0.0], dtype=np.float32), 2)
+
+    assert top.tolist() == [0, 2]
+
+
+def test_top_k_inner_product_caps_k_at_set_size():
+    """Tests that asking for more articles than exist returns all of them"""
+    embeddings = np.random.rand(3, 4).astype(np.float32)
+
+    assert len(top_k_inner_product(embeddings, embeddings[0], 10)) == 3
+
+
+def test_search_large_set_finds_nearest():
+    """Tests that a large article set is ranked exactly and finds the nearest article"""
+    embeddings = np.random.rand(2048, 8).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    article_texts = [f"article {i}" for i in range(len(embeddings))]
+
+    relevant = search_relevant_articles(article_texts, embeddings, embeddings[7:8], 1)
+
+    assert relevant == ["article 7"]
+
+
+def test_parse_json_response_handles_fenced_output():
+    """Tests that plain JSON parses directly and fenced JSON still parses via the fallback"""
+    assert parse_json_response('{"sentiment_score": 7}') == {"sentiment_score": 7}
+    assert parse_json_response('```json\n{"sentiment_score": 7}\n```') == {"sentiment_score": 7}
+
+
+@pytest.mark.asyncio
+@patch('src.providers.analysis_client.ARTICLES_PER_LLM_CALL', 4)
+@patch('src.providers.analysis_client.analyze_single_article', new_callable=AsyncMock)
+@patch('src.providers.analysis_client.analyze_batch', new_callable=AsyncMock)
+async def test_articles_are_analyzed_in_chunks(mock_batch, mock_single):
+    """Tests that articles share requests and a failed chunk falls back to per-article calls"""
+    mock_batch.side_effect = [
+        [{"headline": str(i)} for i in range(4)],
+        ValueError("expected 2 analyses"),
+    ]
+    mock_single.return_value = {"news_items": [{"headline": "single"}]}
+
+    result = await analyze_articles_concurrently("AAPL", [f"article {i}" for i in range(6)])
+
+    assert mock_batch.await_count == 2
+    assert mock_single.await_count == 2
+    assert len(result["news_items"]) == 6
+    assert result["errors_count"] == 0
+
+
+@pytest.mark.asyncio
+@patch('src.providers.analysis_client.generate_content', new_callable=AsyncMock)
+async def test_batch_items_are_matched_by_index(mock_generate):
+    """Tests that batch answers are put back in article order by their index and rejected when one is missing"""
+    mock_generate.return_value.text = '[{"index": 2, "headline": "second"}, {"index": 1, "headline": "first"}]'
+
+    assert await analyze_batch("AAPL", ["a", "b"]) == [{"headline": "first"}, {"headline": "second"}]
+
+    mock_generate.return_value.text = '[{"index": 1, "headline": "first"}, {"index": 1, "headline": "again"}]'
+    with pytest.raises(ValueError):
+        await analyze_batch("AAPL", ["a", "b"])
+
+
+@pytest.mark.asyncio
+@patch('src.providers.analysis_client.analyze_single_article', new_callable=AsyncMock)
+@patch('src.providers.analysis_client.analyze_batch', new_callable=AsyncMock)
+async def test_transient_chunk_failure_is_not_split(mock_batch, mock_single):
+    """Tests that a chunk failing with an already-retried quota error is reported, not re-sent per article"""
+    mock_batch.side_effect = ResourceExhausted("quota")
+
+    result = await analyze_articles_concurrently("AAPL", [f"article {i}" for i in range(3)])
+
+    mock_single.assert_not_awaited()
+    assert result["news_items"] == []
+    assert result["errors_count"] == 1
+
+
+@pytest.mark.asyncio
+@patch('src.providers.analysis_client.get_model')
+async def test_generate_content_retries_transient_errors(mock_get_model):
+    """Tests that a rate-limited Gemini call is retried instead of failing the article"""
+    mock_get_model.return_value.generate_content_async = AsyncMock(side_effect=[ResourceExhausted("quota"), "ok"])
+
+    result = await generate_content.retry_with(wait=wait_none())("prompt", {})
+
+    assert result == "ok"
+
+
+@pytest.mark.asyncio
+@patch('src.providers.analysis_client.get_model')
+async def test_generate_content_shares_one_concurrency_cap(mock_get_model):
+    """Tests that concurrent Gemini calls from separate callers never exceed MAX_CONCURRENT_LLM_CALLS"""
+    in_flight = peak = 0
+
+    async def _generate(*_args, **_kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return "ok"
+
+    mock_get_model.return_value.generate_content_async = _generate
+
+    await asyncio.gather(*(generate_content("prompt", {}) for _ in range(3 * settings.MAX_CONCURRENT_LLM_CALLS)))
+
+    assert peak == settings.MAX_CONCURRENT_LLM_CALLS
+
+
+def test_pack_batches_respects_item_and_char_budgets():
+    """Tests that batches close on either limit and an oversized text stands alone"""
+    items = [("a" * 10, 0), ("b" * 10, 1), ("c" * 50, 2), ("d" * 5, 3), ("e" * 5, 4), ("f" * 5, 5)]
+
+    batches = pack_batches(items, max_items=2, max_chars=30)
+
+    assert [[payload for _, payload in batch] for batch in batches] == [[0, 1], [2], [3, 4], [5]]
@@ -0,0 +1,26 @@
+from src.utils.dedup import dedupe_articles, simhash
+
+WIRE_STORY = (
+    "Apple shares rose on Tuesday after the company reported record quarterly revenue driven by "
+    "strong iPhone demand in China and services growth, beating analyst expectations."
+)
+
+
+def test_syndicated_copies_are_dropped():
+    """Tests that copies differing only in formatting collapse to the first article"""
+    articles = [
+        {"title": "Apple rises", "content": WIRE_STORY + " [+2345 chars]"},
+        {"title": "APPLE RISES", "content": WIRE_STORY.replace(",", "") + " [+2101 chars]"},
+        {"title": "Tesla recall", "content": "Tesla recalled thousands of vehicles over a braking software glitch."},
+    ]
+
+    kept = dedupe_articles(articles)
+
+    assert [article["title"] for article in kept] == ["Apple rises", "Tesla recall"]
+
+
+def test_unrelated_texts_have_distant_fingerprints():
+    """Tests that different stories are far apart in Hamming distance"""
+    distance = (simhash(WIRE_STORY) ^ simhash("Tesla recalled thousands of vehicles over a glitch.")).bit_count()
+
+    assert distance > 3
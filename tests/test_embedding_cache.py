@@ -0,0 +1,47 @@
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from src.providers.analysis_client import embed_articles
+from src.utils.embedding_cache import EmbeddingCache
+
+
+def test_round_trip(tmp_path):
+    """Tests that stored embeddings come back as float32 at half precision and unknown keys are skipped"""
+    cache = EmbeddingCache("test-model", 3, db_path=str(tmp_path / "emb.db"))
+    key = cache.key_for("Some article")
+
+    cache.put_many({key: np.array([0.1, 0.2, 0.3], dtype=np.float32)})
+    found = cache.get_many([key, cache.key_for("Unknown article")])
+
+    assert list(found) == [key]
+    assert found[key].dtype == np.float32
+    np.testing.assert_allclose(found[key], np.array([0.1, 0.2, 0.3], dtype=np.float32), rtol=1e-3)
+
+
+@pytest.mark.asyncio
+@patch('src.providers.analysis_client._batch_embed', new_callable=AsyncMock)
+async def test_embed_articles_only_embeds_misses(mock_batch_embed, tmp_path):
+    """Tests that cached contents are not re-embedded and the query shares the batch"""
+    cache = EmbeddingCache("test-model", 2, db_path=str(tmp_path / "emb.db"))
+    cache.put_many({cache.key_for("cached"): np.array([1.0, 0.0], dtype=np.float32)})
+    mock_batch_embed.return_value = [np.array([0.0, 1.0], dtype=np.float32)] * 2
+
+    article_texts, article_embeddings, query_embedding = await embed_articles(
+        [{'content': "cached"}, {'content': "fresh"}], "query", cache=cache
+    )
+
+    assert article_texts == ["cached", "fresh"]
+    assert article_embeddings.shape == (2, 2)
+    assert query_embedding.shape == (1, 2)
+    mock_batch_embed.assert_awaited_once_with([("fresh", "RETRIEVAL_DOCUMENT"), ("query", "RETRIEVAL_QUERY")])
+
+
+def test_keys_depend_on_embedding_space(tmp_path):
+    """Tests that the same text gets different keys under a different model or task type"""
+    cache = EmbeddingCache("model-a", 256, db_path=str(tmp_path / "emb.db"))
+    other_model = EmbeddingCache("model-b", 256, db_path=str(tmp_path / "emb.db"))
+
+    assert cache.key_for("text") != other_model.key_for("text")
+    assert cache.key_for("text") != cache.key_for("text", task_type="RETRIEVAL_QUERY")
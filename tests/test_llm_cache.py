@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+import orjson
+import pytest
+
+from src.utils.llm_cache import LLMResponseCache
+
+
+def test_lookup_hits_only_identical_inputs(tmp_path):
+    """Tests that a stored response is returned for the same input and ticker only"""
+    cache = LLMResponseCache("model", str(tmp_path))
+    cache.store("AAPL", cache.key_for("Apple surges on record iPhone sales"), {"headline": "cached"})
+
+    assert cache.lookup("AAPL", cache.key_for("Apple surges on record iPhone sales")) == {"headline": "cached"}
+    assert cache.lookup("AAPL", cache.key_for("Apple plunges on weak iPhone sales")) is None
+    assert cache.lookup("MSFT", cache.key_for("Apple surges on record iPhone sales")) is None
+    assert LLMResponseCache("other-model", str(tmp_path)).key_for("text") != cache.key_for("text")
+
+
+@pytest.mark.asyncio
+async def test_saved_entries_survive_reload(tmp_path):
+    """Tests that responses are persisted by save()"""
+    cache = LLMResponseCache("model", str(tmp_path))
+    cache.store("AAPL", cache.key_for("article"), {"headline": "saved"})
+    await cache.save()
+
+    reloaded = LLMResponseCache("model", str(tmp_path))
+    assert reloaded.lookup("AAPL", reloaded.key_for("article")) == {"headline": "saved"}
+
+
+@pytest.mark.asyncio
+async def test_expired_rows_are_not_served_or_saved(tmp_path):
+    """Tests that rows older than the TTL miss and are dropped from disk on save"""
+    cache = LLMResponseCache("model", str(tmp_path), ttl_seconds=60)
+    with patch('src.utils.llm_cache.time.time', return_value=1_000.0):
+        cache.store("AAPL", cache.key_for("old"), {"headline": "old"})
+
+    assert cache.lookup("AAPL", cache.key_for("old")) is None
+
+    cache.store("AAPL", cache.key_for("new"), {"headline": "new"})
+    await cache.save()
+    reloaded = LLMResponseCache("model", str(tmp_path), ttl_seconds=60)
+    assert len(orjson.loads(next(tmp_path.glob("*.json")).read_bytes())["rows"]) == 1
+    assert reloaded.lookup("AAPL", reloaded.key_for("new")) == {"headline": "new"}
+
+
+@pytest.mark.asyncio
+async def test_namespace_cannot_escape_cache_dir(tmp_path):
+    """Tests that a path-like namespace is still written inside the cache directory"""
+    cache_dir = tmp_path / "llm"
+    cache = LLMResponseCache("model", str(cache_dir))
+    cache.store("../../x", cache.key_for("article"), {"headline": "contained"})
+    await cache.save()
+
+    assert [path.parent for path in tmp_path.rglob("*.json")] == [cache_dir]
+    assert LLMResponseCache("model", str(cache_dir)).lookup("../../x", cache.key_for("article")) == {"headline": "contained"}
+
+
+def test_namespace_keeps_only_newest_rows(tmp_path):
+    """Tests that storing past max_rows evicts the oldest responses"""
+    cache = LLMResponseCache("model", str(tmp_path), max_rows=2)
+    for i in range(3):
+        cache.store("AAPL", cache.key_for(str(i)), {"headline": str(i)})
+
+    assert cache.lookup("AAPL", cache.key_for("0")) is None
+    assert cache.lookup("AAPL", cache.key_for("2")) == {"headline": "2"}
@@ -0,0 +1,123 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import os
+
+import httpx
+import orjson
+import pytest
+
+from src.core.interfaces import INewsProvider
+from src.providers.news_client import AutoRetryProvider, CachedNewsProvider, INLINE_PARSE_MAX_BYTES, fetch_articles_raw
+
+ARTICLES = [{"title": "Fake News", "content": "Something happened"}]
+
+
+@pytest.mark.asyncio
+async def test_repeat_fetch_is_served_from_memory(tmp_path):
+    """Tests that a second fetch neither calls the inner provider nor reads the disk file"""
+    inner = MagicMock(spec=INewsProvider)
+    inner.fetch_articles = AsyncMock(return_value=ARTICLES)
+    provider = CachedNewsProvider(inner, cache_dir=str(tmp_path), ttl_seconds=60)
+
+    assert await provider.fetch_articles("AAPL", 10) == ARTICLES
+    (tmp_path / "AAPL_news.json").unlink()
+    assert await provider.fetch_articles("AAPL", 10) == ARTICLES
+
+    inner.fetch_articles.assert_awaited_once_with("AAPL", 10)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("padding", [0, INLINE_PARSE_MAX_BYTES])
+async def test_fetch_articles_raw_parses_inline_and_off_thread(padding):
+    """Tests that small and large NewsAPI bodies parse the same and incomplete articles are dropped"""
+    payload = {"status": "ok", "articles": [
+        {"title": "Kept", "content": "Body " + "x" * padding, "author": "A"},
+        {"title": "No content", "content": None},
+    ]}
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=orjson.dumps(payload)))
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        articles = await fetch_articles_raw("AAPL", "key", 2, client=client)
+
+    assert [article["title"] for article in articles] == ["Kept"]
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_honours_ttl(tmp_path):
+    """Tests that a fresh cache file is used and a stale one is refetched"""
+    cache_file = tmp_path / "AAPL_news.json"
+    cache_file.write_bytes(orjson.dumps(ARTICLES))
+    inner = MagicMock(spec=INewsProvider)
+    inner.fetch_articles = AsyncMock(return_value=ARTICLES)
+
+    assert await CachedNewsProvider(inner, cache_dir=str(tmp_path), ttl_seconds=60).fetch_articles("AAPL", 10) == ARTICLES
+    inner.fetch_articles.assert_not_awaited()
+
+    os.utime(cache_file, (0, 0))
+    await CachedNewsProvider(inner, cache_dir=str(tmp_path), ttl_seconds=60).fetch_articles("AAPL", 10)
+    inner.fetch_articles.assert_awaited_once_with("AAPL", 10)
+
+
+@pytest.mark.asyncio
+async def test_unreadable_cache_path_falls_back_to_inner_provider(tmp_path):
+    """Tests that a cache path that cannot be stat'ed is treated as a miss"""
+    inner = MagicMock(spec=INewsProvider)
+    inner.fetch_articles = AsyncMock(return_value=ARTICLES)
+    provider = CachedNewsProvider(inner, cache_dir=str(tmp_path), ttl_seconds=60)
+
+    with patch('src.providers.news_client.os.stat', side_effect=PermissionError("denied")):
+        assert await provider.fetch_articles("AAPL", 10) == ARTICLES
+
+    inner.fetch_articles.assert_awaited_once_with("AAPL", 10)
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_returns_articles_per_ticker(tmp_path):
+    """Tests that fetch_many fetches every ticker through the provider and keys results by ticker"""
+    inner = MagicMock(spec=INewsProvider)
+    inner.fetch_articles = AsyncMock(side_effect=lambda ticker, count: [{"title": ticker, "content": "c"}])
+    provider = CachedNewsProvider(inner, cache_dir=str(tmp_path), ttl_seconds=60)
+
+    results = await provider.fetch_many(["AAPL", "MSFT", "NVDA"], 5, max_concurrency=2)
+
+    assert list(results) == ["AAPL", "MSFT", "NVDA"]
+    assert results["MSFT"] == [{"title": "MSFT", "content": "c"}]
+    assert inner.fetch_articles.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_provider_retries_and_records_count():
+    """Tests that a failed fetch is retried and the retry count lands in the stats"""
+    inner = MagicMock(spec=INewsProvider)
+    inner.fetch_articles = AsyncMock(side_effect=[httpx.ConnectError("down")] * 2 + [ARTICLES])
+    stats = MagicMock()
+    provider = AutoRetryProvider(inner, stats=stats, max_retries=3, wait_seconds=0)
+
+    assert await provider.fetch_articles("AAPL", 10) == ARTICLES
+    assert inner.fetch_articles.await_count == 3
+    stats.update.assert_called_once_with('retry_count', 1)
+
+
+@pytest.mark.asyncio
+async def test_cache_file_is_replaced_atomically(tmp_path):
+    """Tests that the disk cache is written compactly and no temp file is left behind"""
+    inner = MagicMock(spec=INewsProvider)
+    inner.fetch_articles = AsyncMock(return_value=ARTICLES)
+
+    await CachedNewsProvider(inner, cache_dir=str(tmp_path), ttl_seconds=60).fetch_articles("AAPL", 10)
+
+    assert [p.name for p in tmp_path.iterdir()] == ["AAPL_news.json"]
+    assert (tmp_path / "AAPL_news.json").read_bytes() == orjson.dumps(ARTICLES)
+
+
+@pytest.mark.asyncio
+async def test_failed_cache_save_leaves_no_temp_file(tmp_path):
+    """Tests that a failed rename removes the temp file and still returns the articles"""
+    inner = MagicMock(spec=INewsProvider)
+    inner.fetch_articles = AsyncMock(return_value=ARTICLES)
+    provider = CachedNewsProvider(inner, cache_dir=str(tmp_path), ttl_seconds=60)
+
+    with patch('src.providers.news_client.os.replace', side_effect=OSError("disk full")):
+        assert await provider.fetch_articles("AAPL", 10) == ARTICLES
+
+    assert list(tmp_path.iterdir()) == []
@@ -1,88 +1,117 @@
 import pytest
-from unittest.mock import MagicMock, AsyncMock
 from src.core.pipeline import StockAnalysisPipeline
 from src.core.interfaces import INewsProvider, IStockAnalyzer
 from src.utils.stats_collector import StatsCollector
 
 
+class FakeNewsProvider(INewsProvider):
+    """Returns one canned article and records every (ticker, count) it was asked for."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def fetch_articles(self, ticker, count):
+        self.calls.append((ticker, count))
+        return [{"title": "Fake News", "content": "Something happened"}]
+
+
+class FakeAnalyzer(IStockAnalyzer):
+    """Canned Gemini analyzer; `calls` lists the method names in the order they ran."""
+
+    def __init__(self, relevant_texts=("Fake News Content",)):
+        self.relevant_texts = list(relevant_texts)
+        self.calls = []
+
+    async def filter_relevant(self, ticker, articles, count):
+        self.calls.append("filter_relevant")
+        return self.relevant_texts
+
+    async def analyze(self, ticker, articles):
+        self.calls.append("analyze")
+        return {
+            "news_items": [
+                {"sentiment_score": 9, "sentiment_category": "POSITIVE", "headline": "Fake", "impact_reason": "Good"}
+            ]
+        }
+
+    async def synthesize(self, ticker, analysis_results):
+        self.calls.append("synthesize")
+        return {
+            "overall_summary": "Looks good",
+            "final_sentiment": "Bullish",
+            "recommendation": "BUY",
+            "major_risks": []
+        }
+
+
 @pytest.fixture
-def mock_news_provider():
+def fake_news_provider():
     """Creates a fake news provider"""
-    provider = MagicMock(spec=INewsProvider)
-
-    provider.fetch_articles.return_value = [
-        {"title": "Fake News", "content": "Something happened"}
-    ]
-    return provider
+    return FakeNewsProvider()
 
 
 @pytest.fixture
-def mock_analyzer():
+def fake_analyzer():
     """Creates a fake analyzer (Gemini)"""
-    analyzer = MagicMock(spec=IStockAnalyzer)
+    return FakeAnalyzer()
 
-    analyzer.filter_relevant = AsyncMock(return_value=["Fake News Content"])
 
-    analyzer.analyze.return_value = {
-        "news_items": [
-            {"sentiment_score": 9, "sentiment_category": "POSITIVE", "headline": "Fake", "impact_reason": "Good"}
-        ]
-    }
+def build_pipeline(news_provider, analyzer):
+    """Assembles a pipeline over the given fakes with an in-memory stats collector."""
+    stats = StatsCollector(filename=None)
+    stats.set_initial_context("AAPL", 10, 2)
+    return StockAnalysisPipeline(news_provider=news_provider, analyzer=analyzer, stats=stats), stats
 
-    analyzer.synthesize.return_value = {
-        "overall_summary": "Looks good",
-        "final_sentiment": "Bullish",
-        "recommendation": "BUY",
-        "major_risks": []
-    }
-    return analyzer
 
 @pytest.mark.asyncio
-async def test_pipeline_happy_flow(mock_news_provider, mock_analyzer, tmp_path):
+async def test_pipeline_run(fake_news_provider, fake_analyzer):
     """
-    Tests that the pipeline runs all steps in the correct order
-    without actually calling external APIs.
+    Tests that the pipeline runs all steps in the correct order without calling external APIs.
     """
-    temp_csv = tmp_path / "test_pipeline.csv"
-
-    stats = StatsCollector(filename=str(temp_csv))
-
-    stats.set_initial_context("AAPL", 10, 2)
-
-    pipeline = StockAnalysisPipeline(
-        news_provider=mock_news_provider,
-        analyzer=mock_analyzer,
-        stats=stats
-    )
+    pipeline, stats = build_pipeline(fake_news_provider, fake_analyzer)
 
     result = await pipeline.run("AAPL", fetch_count=10, inference_count=2)
 
     assert result['recommendation'] == "BUY"
     assert result['final_sentiment'] == "Bullish"
 
-    mock_news_provider.fetch_articles.assert_called_once_with("AAPL", 10)
-    mock_analyzer.filter_relevant.assert_called_once()
-    mock_analyzer.analyze.assert_called_once()
+    assert fake_news_provider.calls == [("AAPL", 10)]
+    assert fake_analyzer.calls == ["filter_relevant", "analyze", "synthesize"]
 
     assert stats.stats['articles_returned'] == 1
     assert stats.stats['run_status'] == "IN_PROGRESS"
 
+
 @pytest.mark.asyncio
-async def test_pipeline_fails_on_no_rag_results(mock_news_provider, mock_analyzer, tmp_path):
+async def test_pipeline_run_fails_without_relevant_articles(fake_news_provider):
     """
-    Tests the scenario where the RAG filtering component fails
-    to return any relevant articles, verifying the pipeline's error handling.
+    Tests that the pipeline stops cleanly, before analysis, when RAG filtering returns no articles.
     """
-    mock_analyzer.filter_relevant = AsyncMock(return_value=[])
+    analyzer = FakeAnalyzer(relevant_texts=[])
+    pipeline, _ = build_pipeline(fake_news_provider, analyzer)
 
-    temp_csv = tmp_path / "test_rag_fail.csv"
-    stats = StatsCollector(filename=str(temp_csv))
+    with pytest.raises(Exception, match="RAG returned no relevant articles."):
+        await pipeline.run("AAPL", fetch_count=10, inference_count=2)
 
-    pipeline = StockAnalysisPipeline(
-        news_provider=mock_news_provider,
-        analyzer=mock_analyzer,
-        stats=stats
-    )
+    assert analyzer.calls == ["filter_relevant"]
 
-    with pytest.raises(Exception, match="RAG returned no relevant articles."):
-        await pipeline.run("AAPL", fetch_count=10, inference_count=2)
\ No newline at end of file
+
+@pytest.mark.asyncio
+async def test_pipeline_reuses_report_for_same_articles(fake_news_provider, fake_analyzer):
+    """
+    Tests that a repeat run over the same fetched articles returns the cached
+    report without calling the analyzer again, and still records its metrics.
+    """
+    pipeline, _ = build_pipeline(fake_news_provider, fake_analyzer)
+
+    first = await pipeline.run("AAPL", fetch_count=10, inference_count=2)
+    pipeline.stats = StatsCollector(filename=None)
+    pipeline.stats.set_initial_context("AAPL", 10, 2)
+    second = await pipeline.run("AAPL", fetch_count=10, inference_count=2)
+
+    assert second == first
+    assert fake_analyzer.calls == ["filter_relevant", "analyze", "synthesize"]
+    # The cached run's stats row still carries the analysis and synthesis metrics
+    assert pipeline.stats.stats['analysis_success_count'] == 1
+    assert pipeline.stats.stats['sentiment_score_avg'] == 9.0
+    assert pipeline.stats.stats['final_recommendation'] == "BUY"
@@ -1,6 +1,11 @@
-from fastapi.testclient import TestClient
-from unittest.mock import patch, AsyncMock  # הוספנו AsyncMock
-from src.api.server import app
+import httpx
+import pytest
+import pytest_asyncio
+from unittest.mock import patch, AsyncMock, DEFAULT  # הוספנו AsyncMock
+from src.api.server import app, lifespan
+
+# All tests share the module's event loop, on which the app and client live
+pytestmark = pytest.mark.asyncio(loop_scope="module")
 
 MOCK_RESPONSE = {
     "overall_summary": "Test API Summary",
@@ -9,77 +14,71 @@ MOCK_RESPONSE = {
     "major_risks": ["Risk A", "Risk B"]
 }
 
+PATCHED = ['setup_logging', 'CachedNewsProvider', 'StatsCollector', 'GeminiAnalyzer', 'NewsAPIClient',
+           'StockAnalysisPipeline']
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def server():
+    """
+    One in-process httpx client for the module. ASGITransport calls the app on the
+    test's event loop but does not run the lifespan, so it is entered here, once.
+    Yields the client and the patched dependencies keyed by name.
+    """
+    with patch.multiple('src.api.server', **dict.fromkeys(PATCHED, DEFAULT)) as mocks:
+        mocks['NewsAPIClient'].return_value.aclose = AsyncMock()
+        async with lifespan(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+                yield client, mocks
+
+
+@pytest.fixture
+def pipeline(server):
+    """The pipeline instance the app uses, with its run mock reset for each test."""
+    _, mocks = server
+    instance = mocks['StockAnalysisPipeline'].return_value
+    instance.run = AsyncMock()
+    return instance
+
 
-@patch('src.api.server.setup_logging')
-@patch('src.api.server.CachedNewsProvider')
-@patch('src.api.server.StatsCollector')
-@patch('src.api.server.GeminiAnalyzer')
-@patch('src.api.server.NewsAPIClient')
-@patch('src.api.server.StockAnalysisPipeline')
-def test_analyze_endpoint(
-        mock_pipeline_class,
-        mock_news_class,
-        mock_gemini_class,
-        mock_stats_class,
-        mock_cached_provider_class,
-        mock_setup_logging
-):
+async def test_analyze_endpoint(server, pipeline):
     """
     Tests the /analyze endpoint.
     """
-    mock_instance = mock_pipeline_class.return_value
-    mock_instance.run = AsyncMock(return_value=MOCK_RESPONSE)
-
-    with TestClient(app) as client:
-        response = client.post("/analyze", json={"ticker": "GOOGL"})
-
-        if response.status_code != 200:
-            print(f"Error: {response.json()}")
-
-        assert response.status_code == 200
-        assert response.json() == MOCK_RESPONSE
-
-        mock_instance.run.assert_called_once()
-        args, _ = mock_instance.run.call_args
-        assert args[0] == "GOOGL"
-
-
-@patch('src.api.server.setup_logging')
-@patch('src.api.server.CachedNewsProvider')
-@patch('src.api.server.StatsCollector')
-@patch('src.api.server.GeminiAnalyzer')
-@patch('src.api.server.NewsAPIClient')
-@patch('src.api.server.StockAnalysisPipeline')
-def test_analyze_endpoint_error_handling(
-        mock_pipeline_class,
-        mock_news,
-        mock_gemini,
-        mock_stats,
-        mock_cache,
-        mock_logging
-):
+    client, _ = server
+    pipeline.run.return_value = MOCK_RESPONSE
+
+    response = await client.post("/analyze", json={"ticker": "GOOGL"})
+
+    if response.status_code != 200:
+        print(f"Error: {response.json()}")
+
+    assert response.status_code == 200
+    assert response.json() == MOCK_RESPONSE
+
+    pipeline.run.assert_called_once()
+    args, _ = pipeline.run.call_args
+    assert args[0] == "GOOGL"
+
+
+async def test_analyze_endpoint_error_handling(server, pipeline):
     """
     Tests error handling.
     """
-    mock_instance = mock_pipeline_class.return_value
-
-    mock_instance.run = AsyncMock(side_effect=Exception("Database Connection Failed"))
+    client, _ = server
+    pipeline.run.side_effect = Exception("Database Connection Failed")
 
-    with TestClient(app) as client:
-        response = client.post("/analyze", json={"ticker": "FAIL"})
+    response = await client.post("/analyze", json={"ticker": "FAIL"})
 
-        assert response.status_code == 500
-        assert "Database Connection Failed" in response.json()["detail"]
+    assert response.status_code == 500
+    assert "Database Connection Failed" in response.json()["detail"]
 
 
-def test_health_check():
+async def test_health_check(server):
     """Simple health check test"""
+    client, _ = server
 
-    with patch('src.api.server.setup_logging'), \
-            patch('src.api.server.CachedNewsProvider'), \
-            patch('src.api.server.StatsCollector'), \
-            patch('src.api.server.GeminiAnalyzer'):
-        with TestClient(app) as client:
-            response = client.get("/health")
-            assert response.status_code == 200
-            assert response.json() == {"status": "ok"}
+    response = await client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
@@ -1,21 +1,21 @@
-from src.utils.stats_collector import StatsCollector
+import csv
+import io
 
+from src.utils.stats_collector import CSV_HEADERS, StatsCollector, timed
 
-def test_initialization(tmp_path):
-    """Tests that the class is initialized with correct values in a temporary path"""
-    temp_file = tmp_path / "test_stats.csv"
 
-    stats = StatsCollector(filename=str(temp_file))
+def test_initialization():
+    """Tests that the class is initialized with correct values"""
+    stats = StatsCollector(filename=None)
     stats.set_initial_context(ticker="TSLA", articles_to_fetch=50, articles_to_inference=5)
 
     assert stats.stats['ticker'] == "TSLA"
     assert stats.stats['run_status'] == "IN_PROGRESS"
 
 
-def test_calculate_analysis_metrics(tmp_path):
+def test_calculate_analysis_metrics():
     """Tests the calculation of sentiment averages and counts"""
-    temp_file = tmp_path / "test_stats.csv"
-    stats = StatsCollector(filename=str(temp_file))
+    stats = StatsCollector(filename=None)
 
     mock_news_items = [
         {'sentiment_score': 8, 'sentiment_category': 'POSITIVE'},
@@ -29,3 +29,61 @@ def test_calculate_analysis_metrics(tmp_path):
 
     assert stats.stats['relevant_articles_found'] == 3
     assert stats.stats['sentiment_score_avg'] == 5.0
+    assert stats.stats['sentiment_score_min'] == 2
+    assert stats.stats['sentiment_score_max'] == 8
+    assert stats.stats['news_items_positive_count'] == 1
+    assert stats.stats['news_items_negative_count'] == 1
+    assert stats.stats['news_items_neutral_count'] == 1
+
+
+def test_timed_records_duration():
+    """Tests that a timed block stores its non-negative duration under the given key"""
+    stats = StatsCollector(filename=None)
+
+    with timed(stats, 'fetch_duration_sec') as timer:
+        pass
+
+    assert timer.seconds >= 0.0
+    assert stats.stats['fetch_duration_sec'] == round(timer.seconds, 3)
+
+
+def test_calculate_synthesis_metrics():
+    """Tests that the recommendation fields are recorded and risks stored as JSON"""
+    stats = StatsCollector(filename=None)
+
+    stats.calculate_synthesis_metrics({'recommendation': 'SELL', 'major_risks': ['Debt', 'Rates']}, 0.5)
+
+    assert stats.stats['final_recommendation'] == 'SELL'
+    assert stats.stats['major_risks_json'] == '["Debt","Rates"]'
+
+
+def test_finalize_appends_rows(tmp_path):
+    """Tests that each finalize appends a full row, filling gaps with N/A and skipping extra keys"""
+    temp_file = tmp_path / "test_stats.csv"
+    stats = StatsCollector(filename=str(temp_file))
+    stats.set_initial_context(ticker="TSLA", articles_to_fetch=50, articles_to_inference=5)
+    stats.update('synthesis_duration_sec', 1.0)
+    del stats.stats['final_sentiment']
+
+    stats.finalize()
+    stats.finalize()
+
+    with open(temp_file, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2
+    assert list(rows[0]) == CSV_HEADERS
+    assert rows[0]['ticker'] == "TSLA"
+    assert rows[0]['final_sentiment'] == "N/A"
+
+
+def test_in_memory_collector_keeps_rows():
+    """Tests that a collector without a filename buffers its CSV in memory"""
+    stats = StatsCollector(filename=None)
+    stats.set_initial_context(ticker="TSLA", articles_to_fetch=50, articles_to_inference=5)
+
+    stats.finalize()
+
+    rows = list(csv.DictReader(io.StringIO(stats.csv_text())))
+    assert len(rows) == 1
+    assert rows[0]['ticker'] == "TSLA"
+    assert rows[0]['run_status'] == "OK"